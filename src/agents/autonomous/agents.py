@@ -8,10 +8,16 @@ used in the blueprint and script generation pipeline.
 import logging
 from agents import Agent
 from src.config.settings import settings
-from src.utils.model_selection import ModelSelectionStrategy
+from src.utils.model_selection import (
+    get_strategy,
+    TASK_BLUEPRINT_AUTHORING,
+    TASK_BLUEPRINT_REVIEWING,
+    TASK_SCRIPT_CODING,
+    TASK_SCRIPT_REVIEWING,
+)
 
 logger = logging.getLogger(__name__)
-model_strategy = ModelSelectionStrategy()
+model_strategy = get_strategy()
 
 def setup_blueprint_author_agent() -> Agent:
     """
@@ -20,7 +26,7 @@ def setup_blueprint_author_agent() -> Agent:
     Returns:
         Configured Agent instance
     """
-    model_name = model_strategy.select_model("blueprint_authoring", complexity=0.7)
+    model_name = model_strategy.select_model(TASK_BLUEPRINT_AUTHORING, complexity=0.7)
     logger.info(f"Setting up Blueprint Author Agent with model: {model_name}")
     
     return Agent(
@@ -221,7 +227,7 @@ def setup_blueprint_reviewer_agent() -> Agent:
     Returns:
         Configured Agent instance
     """
-    model_name = model_strategy.select_model("blueprint_reviewing", complexity=0.6)
+    model_name = model_strategy.select_model(TASK_BLUEPRINT_REVIEWING, complexity=0.6)
     logger.info(f"Setting up Blueprint Reviewer Agent with model: {model_name}")
     
     return Agent(
@@ -280,7 +286,7 @@ def setup_script_coder_agent(framework: str) -> Agent:
     Returns:
         Configured Agent instance
     """
-    model_name = model_strategy.select_model("script_coding", complexity=0.7)
+    model_name = model_strategy.select_model(TASK_SCRIPT_CODING, complexity=0.7)
     logger.info(f"Setting up Script Coder Agent for {framework} with model: {model_name}")
     
     # Define framework-specific expected files/structure
@@ -476,7 +482,7 @@ def setup_script_reviewer_agent(framework: str) -> Agent:
     Returns:
         Configured Agent instance
     """
-    model_name = model_strategy.select_model("script_reviewing", complexity=0.6)
+    model_name = model_strategy.select_model(TASK_SCRIPT_REVIEWING, complexity=0.6)
     logger.info(f"Setting up Script Reviewer Agent for {framework} with model: {model_name}")
     
     return Agent(
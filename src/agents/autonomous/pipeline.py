@@ -18,6 +18,12 @@ from src.agents.autonomous.agents import (
     setup_script_coder_agent, setup_script_reviewer_agent
 )
 from src.utils.execution import run_agent_with_retry, RunConfig, RetryConfig
+from src.utils.model_selection import (
+    TASK_BLUEPRINT_AUTHORING,
+    TASK_BLUEPRINT_REVIEWING,
+    TASK_SCRIPT_CODING,
+    TASK_SCRIPT_REVIEWING,
+)
 from src.config.settings import settings
 from agents import RunResult
 from src.blueprint.validation import validate_and_clean_blueprint as validate_blueprint
@@ -164,7 +170,7 @@ async def run_autonomous_blueprint_pipeline(
         try:
             # TODO: Calculate complexity
             complexity = 0.6
-            run_config = RunConfig(complexity=complexity, task="blueprint_authoring")
+            run_config = RunConfig(complexity=complexity, task=TASK_BLUEPRINT_AUTHORING)
             author_result = await run_agent_with_retry(
                 blueprint_author,
                 author_input_data, # Pass the dict WITH spec analysis
@@ -179,7 +185,7 @@ async def run_autonomous_blueprint_pipeline(
                 proposed_blueprint_json = str(proposed_blueprint_json)
             
             # Log Author Output
-            logger.debug(f"AUTHOR Output (Iter {iteration}):\n{proposed_blueprint_json[:1000]}...")
+            logger.debug("AUTHOR Output (Iter %d):\n%.1000s...", iteration, proposed_blueprint_json)
             
             try:
                 # Validate the JSON structure
@@ -237,7 +243,7 @@ async def run_autonomous_blueprint_pipeline(
         try:
             # TODO: Calculate complexity
             complexity = 0.5
-            run_config = RunConfig(complexity=complexity, task="blueprint_reviewing")
+            run_config = RunConfig(complexity=complexity, task=TASK_BLUEPRINT_REVIEWING)
             reviewer_result = await run_agent_with_retry(
                 blueprint_reviewer,
                 reviewer_input_data, # Pass the dict WITH spec analysis
@@ -400,7 +406,7 @@ async def run_autonomous_script_pipeline(
         try:
             # TODO: Calculate complexity
             complexity = 0.7
-            run_config = RunConfig(complexity=complexity, task="script_coding")
+            run_config = RunConfig(complexity=complexity, task=TASK_SCRIPT_CODING)
             coder_result = await run_agent_with_retry(
                 script_coder,
                 coder_input_data, # Pass dict WITH blueprint
@@ -413,7 +419,7 @@ async def run_autonomous_script_pipeline(
                 proposed_script_files_json = str(proposed_script_files_json)
 
             logger.debug(f"CODER Output Chars (Iter {iteration}): {len(proposed_script_files_json)}")
-            logger.debug(f"CODER Output (Iter {iteration}):\n{proposed_script_files_json[:1000]}...")
+            logger.debug("CODER Output (Iter %d):\n%.1000s...", iteration, proposed_script_files_json)
 
             # --- MODIFIED JSON VALIDATION ---
             try:
@@ -525,7 +531,7 @@ async def run_autonomous_script_pipeline(
         try:
             # TODO: Calculate complexity
             complexity = 0.6
-            run_config = RunConfig(complexity=complexity, task="script_reviewing")
+            run_config = RunConfig(complexity=complexity, task=TASK_SCRIPT_REVIEWING)
             reviewer_result = await run_agent_with_retry(
                 script_reviewer,
                 reviewer_input_data, # Pass dict WITH blueprint AND code
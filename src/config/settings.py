@@ -40,6 +40,12 @@ BASE_CONFIG = {
     "BASE_TIMEOUT": "300",
     "MAX_JITTER": "1.0",
     "AUTONOMOUS_MAX_ITERATIONS": "3",
+    "AGENT_TRACING": "true",
+
+    # Result cache settings (disabled unless RESULT_CACHE_DIR is set)
+    "RESULT_CACHE_DIR": None,
+    "RESULT_CACHE_TTL": "604800",
+    "RESULT_CACHE_MAX_BYTES": "104857600",
 
     # Access control
     "ACCESS_TOKENS": '{}',
@@ -74,7 +80,7 @@ def load_settings() -> Dict[str, Any]:
         "PORT", "MAX_RETRIES", "BASE_TIMEOUT", "MAX_JITTER",
         "MODEL_PLANNING_HIGH_THRESHOLD", "MODEL_PLANNING_MEDIUM_THRESHOLD",
         "MODEL_CODING_HIGH_THRESHOLD", "MODEL_CODING_MEDIUM_THRESHOLD",
-        "AUTONOMOUS_MAX_ITERATIONS"
+        "AUTONOMOUS_MAX_ITERATIONS", "RESULT_CACHE_TTL", "RESULT_CACHE_MAX_BYTES"
     ]
     
     for key in numeric_settings:
@@ -89,7 +95,7 @@ def load_settings() -> Dict[str, Any]:
                 pass
     
     # Convert boolean settings
-    bool_settings = ["RELOAD"]
+    bool_settings = ["RELOAD", "AGENT_TRACING"]
     for key in bool_settings:
         if key in settings:
             settings[key] = settings[key].lower() in ("true", "yes", "1", "t", "y")
@@ -130,19 +136,31 @@ def update_settings():
     This function is useful for tests or runtime updates where
     environment variables may change after module initialization.
     """
-    global settings
-    
-    # First clear all existing settings to ensure we start fresh
-    settings.clear()
+    global settings, _settings_version
     
-    # Then load fresh settings
+    # Load fresh settings before touching the shared dict, so readers in
+    # other threads never see it empty or partially populated
     new_settings = load_settings()
     
-    # Update the global settings dict with new values
+    # Swap in the new values, then drop keys that no longer exist
     settings.update(new_settings)
+    for key in settings.keys() - new_settings.keys():
+        del settings[key]
+    _settings_version += 1
     
     logger.info("Settings have been updated from environment variables")
     return settings
 
+def get_settings_version() -> int:
+    """
+    Get a counter that changes every time update_settings() reloads settings.
+    
+    Returns:
+        The current settings version
+    """
+    return _settings_version
+
 # Load settings once at module import
-settings = load_settings() 
\ No newline at end of file
+settings = load_settings()
+_settings_version = 0
+ 
\ No newline at end of file
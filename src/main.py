@@ -23,6 +23,8 @@ import logging
 import sys
 import json
 import asyncio
+import atexit
+import queue
 import logging.config
 import logging.handlers
 from typing import List, Optional, Dict, Any, Union
@@ -45,7 +47,33 @@ from src.api import generate
 from src.api import admin
 from src.errors.exceptions import APITestGenerationError
 from .utils.model_selection import ModelSelectionStrategy
-from .utils.openai_setup import setup_openai_client
+from .utils.openai_setup import setup_openai_client, configure_tracing
+
+# Background listeners writing queued log records to the real handlers
+_log_listeners: List[logging.handlers.QueueListener] = []
+
+def _queue_handler(*handlers: logging.Handler) -> logging.handlers.QueueHandler:
+    """
+    Route records through a queue so handler I/O happens on a background thread.
+    
+    Args:
+        handlers: The handlers that should receive the records
+        
+    Returns:
+        A QueueHandler to attach to the logger in place of the handlers
+    """
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _log_listeners.append(listener)
+    return logging.handlers.QueueHandler(log_queue)
+
+def _stop_log_listeners():
+    """Flush queued records and stop the background log listeners."""
+    while _log_listeners:
+        _log_listeners.pop().stop()
+
+atexit.register(_stop_log_listeners)
 
 # Configure logging
 def configure_logging():
@@ -60,15 +88,17 @@ def configure_logging():
     # Remove existing handlers to prevent duplicates if re-run
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+    _stop_log_listeners()
 
     # Add console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(getattr(logging, log_level))
     console_handler.setFormatter(logging.Formatter(log_format))
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
 
     # Add file handler if LOG_FILE is specified
     log_file = settings.get("LOG_FILE")
+    file_log_error = None
     if log_file:
         try:
             # Make log file path absolute if needed
@@ -83,13 +113,17 @@ def configure_logging():
             file_handler = logging.FileHandler(str(log_file_path), encoding='utf-8')
             file_handler.setLevel(getattr(logging, log_level))
             file_handler.setFormatter(logging.Formatter(log_format))
-            logger.addHandler(file_handler)
-            
-            # We can log this now since we've added at least one handler
-            logger.info(f"File logging configured at: {log_file_path}")
+            handlers.append(file_handler)
         except Exception as e:
             print(f"Error setting up file logging: {e}")
-            logger.error(f"Failed to set up file logging: {str(e)}")
+            file_log_error = e
+    
+    # Write records from a background thread so request handlers never block on log I/O
+    logger.addHandler(_queue_handler(*handlers))
+    if file_log_error is not None:
+        logger.error(f"Failed to set up file logging: {str(file_log_error)}")
+    elif log_file:
+        logger.info(f"File logging configured at: {log_file_path}")
     
     # Configure library loggers to prevent excessive messages
     logging.getLogger("uvicorn").setLevel(logging.INFO)
@@ -115,7 +149,9 @@ def configure_logging():
         audit_log_path, maxBytes=10*1024*1024, backupCount=5, encoding='utf-8'
     )
     audit_handler.setFormatter(audit_formatter)
-    audit_logger.addHandler(audit_handler)
+    for handler in audit_logger.handlers[:]:
+        audit_logger.removeHandler(handler)
+    audit_logger.addHandler(_queue_handler(audit_handler))
     
     # Log startup message using audit logger
     audit_logger.info(
@@ -140,6 +176,9 @@ except Exception as e:
     logger.error(f"Failed to initialize OpenAI client: {str(e)}")
     sys.exit(1)
 
+# Match the SDK trace exporter to the AGENT_TRACING setting
+configure_tracing(settings.get("AGENT_TRACING", True))
+
 # Initialize the FastAPI application
 app = FastAPI(
     title="API Automation Assistant",
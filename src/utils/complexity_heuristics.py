@@ -0,0 +1,39 @@
+"""
+Complexity Heuristics Module - Keyword-based pre-screening of agent inputs
+
+This module provides a cheap, deterministic estimate of task complexity from
+the input text, used when a caller does not supply a complexity score.
+"""
+
+import re
+from typing import Any, Optional
+
+# Complexity scores assigned to confidently classified inputs
+SIMPLE_COMPLEXITY = 0.2
+COMPLEX_COMPLEXITY = 0.8
+
+_SIMPLE_RE = re.compile(r"\b(?:sum|list|define|what is)\b", re.IGNORECASE)
+_COMPLEX_RE = re.compile(r"\b(?:prove|derive|explain why|design)\b", re.IGNORECASE)
+
+def quick_classify(input_data: Any) -> Optional[float]:
+    """
+    Estimate task complexity from keywords in the input.
+
+    Args:
+        input_data: The agent input text
+
+    Returns:
+        SIMPLE_COMPLEXITY or COMPLEX_COMPLEXITY when only one kind of keyword
+        is present, otherwise None (no confident classification)
+    """
+    if not isinstance(input_data, str):
+        return None
+
+    is_complex = _COMPLEX_RE.search(input_data) is not None
+    is_simple = _SIMPLE_RE.search(input_data) is not None
+
+    if is_complex and not is_simple:
+        return COMPLEX_COMPLEXITY
+    if is_simple and not is_complex:
+        return SIMPLE_COMPLEXITY
+    return None
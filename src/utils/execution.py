@@ -7,23 +7,75 @@ streaming support, and error handling.
 
 import asyncio
 import json
-import random
 import logging
 import datetime
-from typing import Tuple, Dict, List, Any, Optional, AsyncIterator, Callable, Union
+import contextlib
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Tuple, Dict, List, Any, Optional, AsyncIterator, Callable, ContextManager, Iterator, Union
 
 from agents import Agent, Runner, gen_trace_id, trace
 from agents.items import RunItem
 from agents import RunResult  # Import RunResult explicitly
 from pydantic import BaseModel
+from tenacity import AsyncRetrying, RetryCallState, stop_after_attempt, wait_exponential_jitter
 
-from .model_selection import ModelSelectionStrategy
+from ..config.settings import settings
+from .model_selection import ModelSelectionStrategy, get_strategy
+from .complexity_heuristics import quick_classify
+from . import result_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Create the logger
 logger = logging.getLogger(__name__)
 
+# Default number of agents run_agents_batch runs at the same time
+DEFAULT_BATCH_CONCURRENCY = 50
+
+# Maximum number of progress updates buffered for a slow streaming callback
+PROGRESS_QUEUE_SIZE = 256
+
+# Run metadata (agent, trace_id, model) for the active streaming run, so
+# progress callbacks can correlate events without it being sent per event
+trace_context: ContextVar[Optional[Dict[str, str]]] = ContextVar("trace_context", default=None)
+
+async def NOOP_PROGRESS_CALLBACK(agent_name: str, item_type: str, content: Any) -> None:
+    """
+    Progress callback for callers that only want the final output.
+    
+    run_agent_with_streaming recognises it and skips building progress updates.
+    """
+
+# Event type -> whether it is a RunItem. RunItem is a typing.Union, so an
+# isinstance check walks every member type in Python on each stream event.
+_RUN_ITEM_TYPES: Dict[type, bool] = {}
+
+def _is_run_item(event: Any) -> bool:
+    """Return whether a stream event is a RunItem, caching the answer per event type."""
+    event_type = type(event)
+    is_item = _RUN_ITEM_TYPES.get(event_type)
+    if is_item is None:
+        is_item = _RUN_ITEM_TYPES[event_type] = isinstance(event, RunItem)
+    return is_item
+
+def _dumps(data: Any) -> str:
+    """Serialize agent input to JSON, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # orjson rejects a few inputs json accepts (e.g. ints over 64 bits)
+            pass
+    return json.dumps(data)
+
 class RetryConfig:
     """Configuration for agent execution with retry logic."""
+    __slots__ = ("max_retries", "base_timeout", "max_jitter")
+    
     def __init__(self, 
                  max_retries: int = 3,
                  base_timeout: int = 300,
@@ -34,6 +86,8 @@ class RetryConfig:
 
 class RunConfig:
     """Configuration for agent execution."""
+    __slots__ = ("timeout", "complexity", "task", "input_data")
+    
     def __init__(self,
                  timeout: int = 300,
                  complexity: float = 0.5,
@@ -44,13 +98,89 @@ class RunConfig:
         self.task = task
         self.input_data = input_data
 
+@dataclass(slots=True)
+class _PreparedRun:
+    """Per-call state shared by the agent execution entrypoints."""
+    input_data: str
+    selected_model: str
+    timeout: int
+    trace_id: str
+
+@contextlib.contextmanager
+def _patched_agent(
+    agent: Agent,
+    input_data: Union[str, dict],
+    task: str,
+    complexity: float,
+    base_timeout: int,
+    model_selection: Optional[ModelSelectionStrategy]
+) -> Iterator[_PreparedRun]:
+    """
+    Apply model selection to an agent for the duration of one run.
+    
+    The agent's model and model_kwargs are updated in place and restored
+    when the block exits, whether or not the run succeeded.
+    
+    Args:
+        agent: The agent to run
+        input_data: The input data (string or dict)
+        task: Task type for model selection
+        complexity: Task complexity (0-1) to determine model
+        base_timeout: Base timeout in seconds before complexity scaling
+        model_selection: Optional model selection strategy
+        
+    Yields:
+        The prepared run
+    """
+    # Convert dict to JSON string if needed
+    if isinstance(input_data, dict):
+        input_data = _dumps(input_data)
+    
+    # Create model selection strategy if not provided
+    model_selection = model_selection or get_strategy()
+    
+    original_model = agent.model
+    original_model_kwargs = getattr(agent, "model_kwargs", {})
+    try:
+        # Select model based on task and complexity
+        selected_model = model_selection.select_model(task, complexity)
+        agent.model = selected_model
+        
+        # Update agent configuration based on complexity
+        agent.model_kwargs = model_selection.update_model_kwargs(original_model_kwargs, complexity)
+        
+        yield _PreparedRun(
+            input_data=input_data,
+            selected_model=selected_model,
+            # Calculate timeout based on complexity
+            timeout=model_selection.calculate_timeout(base_timeout, complexity),
+            # When AGENT_TRACING is off, runs skip trace ids and trace spans entirely;
+            # read per run so update_settings() takes effect without a restart
+            trace_id=gen_trace_id() if settings.get("AGENT_TRACING", True) else ""
+        )
+    finally:
+        # Restore original model and configuration
+        agent.model = original_model
+        agent.model_kwargs = original_model_kwargs
+
+def _trace_span(workflow_name: str, trace_id: str) -> ContextManager:
+    """Open an agents trace for the run, or a no-op context when tracing is disabled."""
+    # Runs get an empty trace id when tracing was disabled as they started
+    if trace_id:
+        return trace(workflow_name, trace_id=trace_id)
+    return contextlib.nullcontext()
+
+def _log_retry_wait(retry_state: RetryCallState) -> None:
+    """Log the backoff before the next agent attempt."""
+    logger.info("Retrying in %.2f seconds...", retry_state.next_action.sleep)
+
 async def run_agent_with_retry(
     agent: Agent, 
     input_data: Union[str, dict], 
     config: RetryConfig = None,
     run_config: RunConfig = None,
     context: Any = None,  # Add context parameter
-    complexity: float = 0.5,
+    complexity: Optional[float] = None,
     task: str = "general",
     model_selection: ModelSelectionStrategy = None
 ) -> Tuple[RunResult, str]:  # Return RunResult instead of Any
@@ -63,12 +193,14 @@ async def run_agent_with_retry(
         config: Retry configuration
         run_config: Run configuration (takes precedence over complexity/task)
         context: Optional context data to pass to the agent
-        complexity: Task complexity (0-1) to determine model
+        complexity: Task complexity (0-1) to determine model; estimated from
+            input keywords (default 0.5) when omitted
         task: Task type for model selection
         model_selection: Optional model selection strategy
         
     Returns:
-        Tuple of (RunResult, trace_id)
+        Tuple of (RunResult, trace_id); a result cache hit returns a
+        CachedRunResult exposing only final_output
     """
     # Use default config if not provided
     config = config or RetryConfig()
@@ -81,62 +213,86 @@ async def run_agent_with_retry(
         if run_config.input_data is not None and input_data is None:
             input_data = run_config.input_data
     
-    # Convert dict to JSON string if needed
-    if isinstance(input_data, dict):
-        input_data = json.dumps(input_data)
-    
-    # Create model selection strategy if not provided
-    model_selection = model_selection or ModelSelectionStrategy()
-    
-    # Select model based on task and complexity
-    original_model = agent.model
-    selected_model = model_selection.select_model(task, complexity)
-    agent.model = selected_model
-    
-    # Update agent configuration based on complexity
-    original_model_kwargs = getattr(agent, "model_kwargs", {})
-    agent_config = {"model_kwargs": original_model_kwargs}
-    agent_config = model_selection.update_tool_choice(agent_config, complexity)
-    agent.model_kwargs = agent_config["model_kwargs"]
-    
-    # Calculate timeout based on complexity
-    timeout = model_selection.calculate_timeout(config.base_timeout, complexity)
-    
-    # Generate trace ID
-    trace_id = gen_trace_id()
-    
-    logger.info(f"Running {agent.name} with model {selected_model}, timeout {timeout}s, complexity {complexity:.2f}")
+    if complexity is None:
+        # No explicit complexity: pre-screen the input with keyword heuristics
+        if isinstance(input_data, dict):
+            input_data = _dumps(input_data)
+        complexity = quick_classify(input_data)
+        if complexity is None:
+            complexity = 0.5
     
-    with trace(f"{agent.name} Execution", trace_id=trace_id):
-        for attempt in range(config.max_retries):
+    with _patched_agent(agent, input_data, task, complexity, config.base_timeout, model_selection) as prep:
+        # Identical agent/model/input combinations can be served from the result cache;
+        # runs with a context are never cached since the context is not part of the key
+        cache_key = None
+        if context is None and result_cache.enabled():
+            cache_key = result_cache.fingerprint(agent.name, prep.selected_model, prep.input_data)
+            cached_result = result_cache.get(cache_key)
+            if cached_result is not None:
+                logger.info("Using cached result for %s with model %s", agent.name, prep.selected_model)
+                return cached_result, prep.trace_id
+        
+        logger.info("Running %s with model %s, timeout %ds, complexity %.2f", agent.name, prep.selected_model, prep.timeout, complexity)
+        
+        # Exponential backoff (1s, 2s, 4s, ... capped at 30s) plus random jitter
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(config.max_retries),
+            wait=wait_exponential_jitter(initial=1, max=30, jitter=config.max_jitter),
+            sleep=asyncio.sleep,
+            before_sleep=_log_retry_wait,
+            reraise=True
+        )
+        
+        with _trace_span(f"{agent.name} Execution", prep.trace_id):
             try:
-                logger.info(f"Attempt {attempt+1}/{config.max_retries} for {agent.name}")
-                
-                # Run the agent with context parameter
-                result: RunResult = await Runner.run(agent, input=input_data, context=context)
-                logger.info(f"Agent {agent.name} completed successfully")
-                
-                # Restore original model and configuration
-                agent.model = original_model
-                agent.model_kwargs = original_model_kwargs
-                
-                return result, trace_id
-                
-            except Exception as e:
-                error_type = type(e).__name__
-                logger.error(f"Agent {agent.name} failed with {error_type}: {str(e)}")
-                
-                if attempt == config.max_retries - 1:  # Last attempt
-                    logger.error(f"All {config.max_retries} attempts failed for {agent.name}")
-                    # Restore original model and configuration
-                    agent.model = original_model
-                    agent.model_kwargs = original_model_kwargs
-                    raise
-                
-                # Exponential backoff with jitter
-                wait_time = min(30, (2 ** attempt) + random.uniform(0, config.max_jitter))
-                logger.info(f"Retrying in {wait_time:.2f} seconds...")
-                await asyncio.sleep(wait_time)
+                async for attempt in retrying:
+                    with attempt:
+                        logger.info("Attempt %d/%d for %s", attempt.retry_state.attempt_number, config.max_retries, agent.name)
+                        
+                        try:
+                            # Run the agent with context parameter
+                            result: RunResult = await Runner.run(agent, input=prep.input_data, context=context)
+                        except Exception as e:
+                            logger.error("Agent %s failed with %s: %s", agent.name, type(e).__name__, e)
+                            raise
+                        
+                        logger.info("Agent %s completed successfully", agent.name)
+            except Exception:
+                logger.error("All %d attempts failed for %s", config.max_retries, agent.name)
+                raise
+        
+        # Cache outside the retry loop so a cache failure never reruns the agent
+        if cache_key is not None:
+            result_cache.put(cache_key, result_cache.CachedRunResult.from_run_result(result))
+        
+        return result, prep.trace_id
+
+async def run_agents_batch(
+    jobs: List[Dict[str, Any]],
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY
+) -> List[Union[Tuple[RunResult, str], BaseException]]:
+    """
+    Run several agents concurrently with bounded parallelism.
+
+    Each job is a dict of keyword arguments for run_agent_with_retry. Jobs
+    that share the same Agent instance should not be batched together, since
+    model selection temporarily mutates the agent while it runs.
+
+    Args:
+        jobs: Keyword arguments for each run_agent_with_retry call
+        max_concurrency: Maximum number of agents running at the same time
+
+    Returns:
+        List of (RunResult, trace_id) tuples or exceptions, in job order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _run_one(job: Dict[str, Any]) -> Tuple[RunResult, str]:
+        async with semaphore:
+            return await run_agent_with_retry(**job)
+
+    # return_exceptions keeps one failed job from cancelling the rest
+    return await asyncio.gather(*(_run_one(job) for job in jobs), return_exceptions=True)
 
 def run_agent_sync(
     agent: Agent,
@@ -154,48 +310,62 @@ def run_agent_sync(
         model_selection: Optional model selection strategy
         
     Returns:
-        The agent's result
+        The agent's result, or a CachedRunResult on a result cache hit
     """
     # Use default config if not provided
     config = config or RunConfig()
     
-    # Convert dict to JSON string if needed
-    if isinstance(input_data, dict):
-        input_data = json.dumps(input_data)
-    
-    # Create model selection strategy if not provided
-    model_selection = model_selection or ModelSelectionStrategy()
-    
-    # Select model based on task and complexity
-    original_model = agent.model
-    selected_model = model_selection.select_model(config.task, config.complexity)
-    agent.model = selected_model
-    
-    # Update agent configuration based on complexity
-    original_model_kwargs = getattr(agent, "model_kwargs", {})
-    agent_config = {"model_kwargs": original_model_kwargs}
-    agent_config = model_selection.update_tool_choice(agent_config, config.complexity)
-    agent.model_kwargs = agent_config["model_kwargs"]
-    
-    # Calculate timeout based on complexity
-    timeout = model_selection.calculate_timeout(config.timeout, config.complexity)
-    
-    logger.info(f"Running {agent.name} synchronously with model {selected_model}, timeout {timeout}s")
-    
-    try:
-        # Generate trace ID for logging
-        trace_id = gen_trace_id()
+    with _patched_agent(agent, input_data, config.task, config.complexity, config.timeout, model_selection) as prep:
+        logger.info("Running %s synchronously with model %s, timeout %ds", agent.name, prep.selected_model, prep.timeout)
+        
+        cache_key = None
+        if result_cache.enabled():
+            cache_key = result_cache.fingerprint(agent.name, prep.selected_model, prep.input_data)
+            cached_result = result_cache.get(cache_key)
+            if cached_result is not None:
+                logger.info("Using cached result for %s with model %s (sync)", agent.name, prep.selected_model)
+                return cached_result
         
         # Use trace for consistent tracing
-        with trace(f"{agent.name} Sync", trace_id=trace_id):
+        with _trace_span(f"{agent.name} Sync", prep.trace_id):
             # Run the agent synchronously without timeout parameter
-            result = Runner.run_sync(agent, input=input_data)
-            logger.info(f"Agent {agent.name} completed successfully (sync)")
-            return result
+            result = Runner.run_sync(agent, input=prep.input_data)
+            logger.info("Agent %s completed successfully (sync)", agent.name)
+        
+        if cache_key is not None:
+            result_cache.put(cache_key, result_cache.CachedRunResult.from_run_result(result))
+        return result
+
+async def _drain_progress(queue: asyncio.Queue, progress_callback: Callable[[str, str, Any], Any]) -> None:
+    """Deliver queued progress updates to the callback in order."""
+    while True:
+        agent_name, item_type, content = await queue.get()
+        try:
+            await progress_callback(agent_name, item_type, content)
+        except Exception as callback_error:
+            # Log but keep delivering later updates
+            logger.error("Error in progress callback: %s", callback_error)
+        finally:
+            queue.task_done()
+
+async def _wait_for_progress(queue: asyncio.Queue, worker: asyncio.Task) -> None:
+    """Wait until every queued update is delivered, re-raising if the worker dies first."""
+    joined = asyncio.ensure_future(queue.join())
+    try:
+        await asyncio.wait({joined, worker}, return_when=asyncio.FIRST_COMPLETED)
     finally:
-        # Restore original model and configuration
-        agent.model = original_model
-        agent.model_kwargs = original_model_kwargs
+        joined.cancel()
+    if worker.done():
+        # The worker only stops on a BaseException from the callback; without
+        # this the unfinished queue would keep join() waiting forever
+        worker.result()
+
+def _enqueue_progress(queue: asyncio.Queue, agent_name: str, item_type: str, content: Any) -> None:
+    """Queue a progress update without waiting for the callback."""
+    try:
+        queue.put_nowait((agent_name, item_type, content))
+    except asyncio.QueueFull:
+        logger.warning("Dropping progress update for %s: callback is falling behind", agent_name)
 
 async def run_agent_with_streaming(
     agent: Agent,
@@ -210,7 +380,9 @@ async def run_agent_with_streaming(
     Args:
         agent: The agent to run
         input_data: The input data (string or dict)
-        progress_callback: Callback function for progress updates (agent_name, item_type, content)
+        progress_callback: Callback function for progress updates (agent_name, item_type, content);
+            run metadata is available from trace_context while it runs. Pass
+            NOOP_PROGRESS_CALLBACK to skip progress handling entirely
         config: Run configuration
         model_selection: Optional model selection strategy
         
@@ -224,91 +396,85 @@ async def run_agent_with_streaming(
     if config.input_data is not None and input_data is None:
         input_data = config.input_data
     
-    # Convert dict to JSON string if needed
-    if isinstance(input_data, dict):
-        input_data = json.dumps(input_data)
-    
-    # Create model selection strategy if not provided
-    model_selection = model_selection or ModelSelectionStrategy()
-    
-    # Select model based on task and complexity
-    original_model = agent.model
-    selected_model = model_selection.select_model(config.task, config.complexity)
-    agent.model = selected_model
-    
-    # Update agent configuration based on complexity
-    original_model_kwargs = getattr(agent, "model_kwargs", {})
-    agent_config = {"model_kwargs": original_model_kwargs}
-    agent_config = model_selection.update_tool_choice(agent_config, config.complexity)
-    agent.model_kwargs = agent_config["model_kwargs"]
-    
-    # Calculate timeout based on complexity
-    timeout = model_selection.calculate_timeout(config.timeout, config.complexity)
-    
-    logger.info(f"Running streaming agent {agent.name} with model {selected_model}, timeout {timeout}s")
-    
-    # Generate trace ID for monitoring
-    trace_id = gen_trace_id()
-    
-    with trace(f"{agent.name} Streaming", trace_id=trace_id):
-        try:
-            # Start streaming run (removed timeout parameter that causes errors)
-            result = Runner.run_streamed(agent, input=input_data)
-            
-            # Process streaming events with proper error handling
-            async for event in result.stream_events():
-                try:
-                    # Extract streaming information
-                    if hasattr(event, 'delta') and event.delta:
-                        # Send progress update
-                        await progress_callback(
-                            agent.name, 
-                            getattr(event, 'item_type', 'unknown'),
-                            event.delta
-                        )
-                    elif isinstance(event, RunItem):
-                        # Process completed items
-                        item_type = type(event).__name__
-                        content = None
-                        
-                        if hasattr(event, 'content'):
-                            if isinstance(event.content, list):
-                                # Extract text from MessageContentItem
-                                text_blocks = [
-                                    item.text for item in event.content 
-                                    if hasattr(item, 'text') and item.text
-                                ]
-                                content = "\n".join(text_blocks)
-                            else:
-                                content = str(event.content)
-                        
-                        # Send item completion
-                        await progress_callback(agent.name, item_type, content)
-                except Exception as stream_event_error:
-                    # Log but continue processing other events
-                    logger.error(f"Error processing stream event: {str(stream_event_error)}")
-            
-            logger.info(f"Agent {agent.name} streaming completed")
-            
-            # Restore original model and configuration
-            agent.model = original_model
-            agent.model_kwargs = original_model_kwargs
-            
-            return result.final_output
-            
-        except asyncio.TimeoutError:
-            error_msg = f"Agent {agent.name} streaming timed out after {timeout} seconds"
-            logger.error(error_msg)
-            agent.model = original_model
-            agent.model_kwargs = original_model_kwargs
-            raise TimeoutError(error_msg)
-        except Exception as e:
-            error_type = type(e).__name__
-            logger.error(f"Agent {agent.name} streaming failed with {error_type}: {str(e)}")
-            # Restore original model and configuration
-            agent.model = original_model
-            agent.model_kwargs = original_model_kwargs
-            raise
+    with _patched_agent(agent, input_data, config.task, config.complexity, config.timeout, model_selection) as prep:
+        logger.info("Running streaming agent %s with model %s, timeout %ds", agent.name, prep.selected_model, prep.timeout)
+        
+        context_token = trace_context.set({
+            "agent": agent.name,
+            "trace_id": prep.trace_id,
+            "model": prep.selected_model
+        })
+        
+        # Deliver progress from a background task so a slow callback does not
+        # hold up the stream (created after trace_context.set so it inherits it)
+        progress_queue: Optional[asyncio.Queue] = None
+        progress_worker: Optional[asyncio.Task] = None
+        if progress_callback is not NOOP_PROGRESS_CALLBACK:
+            progress_queue = asyncio.Queue(maxsize=PROGRESS_QUEUE_SIZE)
+            progress_worker = asyncio.create_task(_drain_progress(progress_queue, progress_callback))
+        
+        with _trace_span(f"{agent.name} Streaming", prep.trace_id):
+            try:
+                # Start streaming run (removed timeout parameter that causes errors)
+                result = Runner.run_streamed(agent, input=prep.input_data)
+                
+                # Process streaming events with proper error handling
+                async for event in result.stream_events():
+                    if progress_queue is None:
+                        # No-op callback: only the final output is needed
+                        continue
+                    try:
+                        # Extract streaming information
+                        if hasattr(event, 'delta') and event.delta:
+                            # Send progress update
+                            _enqueue_progress(
+                                progress_queue,
+                                agent.name, 
+                                getattr(event, 'item_type', 'unknown'),
+                                event.delta
+                            )
+                        elif _is_run_item(event):
+                            # Process completed items
+                            item_type = type(event).__name__
+                            content = None
+                            
+                            if hasattr(event, 'content'):
+                                if isinstance(event.content, list):
+                                    # Extract text from MessageContentItem
+                                    text_blocks = [
+                                        item.text for item in event.content 
+                                        if hasattr(item, 'text') and item.text
+                                    ]
+                                    content = "\n".join(text_blocks)
+                                else:
+                                    content = str(event.content)
+                            
+                            # Send item completion
+                            _enqueue_progress(progress_queue, agent.name, item_type, content)
+                    except Exception as stream_event_error:
+                        # Log but continue processing other events
+                        logger.error("Error processing stream event: %s", stream_event_error)
+                
+                # Let the callback catch up before reporting completion
+                if progress_queue is not None:
+                    await _wait_for_progress(progress_queue, progress_worker)
+                logger.info("Agent %s streaming completed", agent.name)
+                
+                return result.final_output
+                
+            except asyncio.TimeoutError:
+                error_msg = f"Agent {agent.name} streaming timed out after {prep.timeout} seconds"
+                logger.error(error_msg)
+                raise TimeoutError(error_msg)
+            except Exception as e:
+                logger.error("Agent %s streaming failed with %s: %s", agent.name, type(e).__name__, e)
+                raise
+            finally:
+                if progress_worker is not None:
+                    progress_worker.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await progress_worker
+                trace_context.reset(context_token)
 
 def create_run_context(request_data: Dict[str, Any]) -> Dict[str, Any]:
     """
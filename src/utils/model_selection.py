@@ -1,19 +1,29 @@
-import os
-import logging
-from typing import Dict, Any, Optional
-
-# Add path adjustment for imports
 import sys
-import os
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(os.path.dirname(current_dir))
-if parent_dir not in sys.path:
-    sys.path.insert(0, parent_dir)
+import logging
+import bisect
+import functools
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Tuple
 
-from src.config.settings import settings
+from src.config.settings import settings, get_settings_version
 
 logger = logging.getLogger(__name__)
 
+# Task type names, interned so callers and the alias table share one object
+TASK_PLANNING = sys.intern("planning")
+TASK_CODING = sys.intern("coding")
+TASK_TRIAGE = sys.intern("triage")
+TASK_CODE_GENERATION = sys.intern("code_generation")
+TASK_BLUEPRINT_AUTHORING = sys.intern("blueprint_authoring")
+TASK_BLUEPRINT_REVIEWING = sys.intern("blueprint_reviewing")
+TASK_SCRIPT_CODING = sys.intern("script_coding")
+TASK_SCRIPT_REVIEWING = sys.intern("script_reviewing")
+
+# Shared, read-only model kwargs for each tool choice level
+_TC_REQUIRED = MappingProxyType({"tool_choice": "required"})
+_TC_AUTO = MappingProxyType({"tool_choice": "auto"})
+_TC_NONE = MappingProxyType({})
+
 class ModelSelectionStrategy:
     """
     Strategy for selecting the optimal model based on task and complexity.
@@ -28,6 +38,11 @@ class ModelSelectionStrategy:
     The strategy can be configured via environment variables or directly.
     """
     
+    __slots__ = (
+        "default_model", "env_prefix", "model_config", "complexity_thresholds",
+        "_tier_thresholds", "_select_cached",
+    )
+    
     def __init__(self, 
                 default_model: str = None,
                 env_prefix: str = "MODEL_"):
@@ -38,40 +53,73 @@ class ModelSelectionStrategy:
             default_model: Fallback model if no specific model is configured
             env_prefix: Prefix for model settings (e.g., MODEL_PLANNING)
         """
-        # Import settings freshly to ensure we get the latest values
-        from src.config.settings import settings as fresh_settings
-        
         # Use settings from the centralized settings module
-        self.default_model = default_model or fresh_settings.get("MODEL_DEFAULT", "gpt-4o-mini")
+        self.default_model = default_model or settings.get("MODEL_DEFAULT", "gpt-4o-mini")
         self.env_prefix = env_prefix
         
-        # Load model configuration from settings
-        self.model_config = {
-            "planning": fresh_settings.get("MODEL_PLANNING", "gpt-4o"),
-            "coding": fresh_settings.get("MODEL_CODING", "gpt-4o"),
-            "triage": fresh_settings.get("MODEL_TRIAGE", "gpt-3.5-turbo"),
-            "default": fresh_settings.get("MODEL_DEFAULT", self.default_model),
+        # Load model configuration from settings (read-only so instances can be shared)
+        self.model_config = MappingProxyType({
+            "planning": settings.get("MODEL_PLANNING", "gpt-4o"),
+            "coding": settings.get("MODEL_CODING", "gpt-4o"),
+            "triage": settings.get("MODEL_TRIAGE", "gpt-3.5-turbo"),
+            "default": settings.get("MODEL_DEFAULT", self.default_model),
             # Add new autonomous agent model configurations
-            "blueprint_authoring": fresh_settings.get("MODEL_BP_AUTHOR", "gpt-4o"),
-            "blueprint_reviewing": fresh_settings.get("MODEL_BP_REVIEWER", "gpt-4o"),
-            "script_coding": fresh_settings.get("MODEL_SCRIPT_CODER", "gpt-4o"),
-            "script_reviewing": fresh_settings.get("MODEL_SCRIPT_REVIEWER", "gpt-4o"),
-        }
-        
-        # Configure complexity thresholds from settings
-        self.complexity_thresholds = {
-            "planning": {
-                "high": float(fresh_settings.get("MODEL_PLANNING_HIGH_THRESHOLD", 0.7)),
-                "medium": float(fresh_settings.get("MODEL_PLANNING_MEDIUM_THRESHOLD", 0.4))
-            },
-            "coding": {
-                "high": float(fresh_settings.get("MODEL_CODING_HIGH_THRESHOLD", 0.8)),
-                "medium": float(fresh_settings.get("MODEL_CODING_MEDIUM_THRESHOLD", 0.5))
-            }
-        }
-        
-        logger.debug(f"Initialized ModelSelectionStrategy with config: {self.model_config}")
-        logger.info(f"Using models: planning={self.model_config['planning']}, coding={self.model_config['coding']}, triage={self.model_config['triage']}")
+            "blueprint_authoring": settings.get("MODEL_BP_AUTHOR", "gpt-4o"),
+            "blueprint_reviewing": settings.get("MODEL_BP_REVIEWER", "gpt-4o"),
+            "script_coding": settings.get("MODEL_SCRIPT_CODER", "gpt-4o"),
+            "script_reviewing": settings.get("MODEL_SCRIPT_REVIEWER", "gpt-4o"),
+        })
+        
+        # Configure complexity thresholds from settings (read-only, like model_config)
+        self.complexity_thresholds = MappingProxyType({
+            TASK_PLANNING: MappingProxyType({
+                "high": float(settings.get("MODEL_PLANNING_HIGH_THRESHOLD", 0.7)),
+                "medium": float(settings.get("MODEL_PLANNING_MEDIUM_THRESHOLD", 0.4))
+            }),
+            TASK_CODING: MappingProxyType({
+                "high": float(settings.get("MODEL_CODING_HIGH_THRESHOLD", 0.8)),
+                "medium": float(settings.get("MODEL_CODING_MEDIUM_THRESHOLD", 0.5))
+            })
+        })
+        
+        # Ascending (medium, high) cut-offs per task, indexing into _TIER_MODELS
+        self._tier_thresholds = MappingProxyType({
+            task: (thresholds["medium"], thresholds["high"])
+            for task, thresholds in self.complexity_thresholds.items()
+        })
+        
+        # Per-instance LRU of (task, complexity) -> model; selection only
+        # depends on the configuration fixed above
+        self._select_cached = functools.lru_cache(maxsize=self._SELECTION_CACHE_SIZE)(self._select_uncached)
+        
+        logger.info(
+            "ModelSelectionStrategy ready: planning=%s, coding=%s, triage=%s, default=%s",
+            self.model_config['planning'], self.model_config['coding'],
+            self.model_config['triage'], self.model_config['default']
+        )
+    
+    # Map task aliases to the model_config key they use
+    _TASK_ALIASES = MappingProxyType({
+        TASK_CODE_GENERATION: TASK_CODING,
+        TASK_PLANNING: TASK_PLANNING,
+        TASK_TRIAGE: TASK_TRIAGE,
+        TASK_CODING: TASK_CODING,
+        # Autonomous agent tasks
+        TASK_BLUEPRINT_AUTHORING: TASK_BLUEPRINT_AUTHORING,
+        TASK_BLUEPRINT_REVIEWING: TASK_BLUEPRINT_REVIEWING,
+        TASK_SCRIPT_CODING: TASK_SCRIPT_CODING,
+        TASK_SCRIPT_REVIEWING: TASK_SCRIPT_REVIEWING,
+    })
+    
+    # Fallback models for the low, medium and high complexity tiers, cheapest first
+    _TIER_MODELS = ("gpt-3.5-turbo", "gpt-4o-mini", "gpt-4o")
+    
+    # Timeout scaling (1 + 2 * complexity) in thousandths, per 0.1 of complexity
+    _TIMEOUT_SCALE_LUT = tuple(1000 + 200 * i for i in range(11))
+    _MIN_TIMEOUT = 60
+    
+    # Number of (task, complexity) selections remembered per strategy
+    _SELECTION_CACHE_SIZE = 256
     
     def select_model(self, task: str, complexity: float) -> str:
         """
@@ -84,100 +132,120 @@ class ModelSelectionStrategy:
         Returns:
             Model name to use
         """
-        try:
-            logger.debug(f"Original task requested: {task} with complexity {complexity}")
-            
-            # Map task aliases to standard task types
-            task_mapping = {
-                "code_generation": "coding",
-                "planning": "planning",
-                "triage": "triage",
-                "coding": "coding",
-                # Add new task mappings for autonomous agents
-                "blueprint_authoring": "blueprint_authoring",
-                "blueprint_reviewing": "blueprint_reviewing",
-                "script_coding": "script_coding",
-                "script_reviewing": "script_reviewing"
-            }
-            
-            # Standardize the task name
-            standard_task = task_mapping.get(task)
-            if standard_task:
-                logger.debug(f"Mapped task {task} to standard task {standard_task}")
-                task = standard_task
-            else:
-                logger.warning(f"Unknown task type: {task}, will try to use as-is or fall back to default")
-            
-            # Always respect the task-specific model from config if it exists
-            if task in self.model_config and self.model_config.get(task):
-                selected_model = self.model_config.get(task)
-                logger.info(f"Using configured model {selected_model} for {task} task with complexity {complexity:.2f}")
-                return selected_model
+        # Unknown tasks fall through to the default model in _select_by_complexity
+        selected_model = self._select_cached(task, complexity)
+        logger.info("Selected model %s for %s task with complexity %.2f", selected_model, task, complexity)
+        return selected_model
+    
+    def _select_uncached(self, task: str, complexity: float) -> str:
+        """Resolve the model for a task, behind the per-instance selection cache."""
+        standard_task = self._standardize_task(task)
+        
+        # Always respect the task-specific model from config if it exists,
+        # otherwise select based on complexity
+        return self.model_config.get(standard_task) or self._select_by_complexity(standard_task, complexity)
+    
+    def select_models_batch(self, tasks: Sequence[str], complexities: Sequence[float]) -> List[str]:
+        """
+        Select models for many (task, complexity) pairs at once.
+        
+        Each distinct task is resolved once, and a single summary line is
+        logged instead of one per selection.
+        
+        Args:
+            tasks: Task types, one per selection
+            complexities: Complexity scores (0-1), aligned with tasks
             
-            # If no task-specific model is configured, select based on complexity
-            logger.debug(f"No direct model config for task '{task}', selecting based on complexity")
-            if task == "triage":
-                # Triage is a simple routing task, use lightweight model
-                selected_model = self.model_config.get("triage", "gpt-3.5-turbo")
-                
-            elif task == "planning":
-                thresholds = self.complexity_thresholds.get("planning", {"high": 0.7, "medium": 0.4})
-                
-                if complexity > thresholds["high"]:
-                    # High complexity planning - use the most capable model
-                    selected_model = "gpt-4o"
-                elif complexity > thresholds["medium"]:
-                    # Medium complexity - balance capability and cost
-                    selected_model = "gpt-4o-mini"
-                else:
-                    # Low complexity - use cost-effective model
-                    selected_model = "gpt-3.5-turbo"
-                    
-            elif task == "coding":
-                thresholds = self.complexity_thresholds.get("coding", {"high": 0.8, "medium": 0.5})
-                
-                if complexity > thresholds["high"]:
-                    # High complexity coding - use the most capable model
-                    selected_model = "gpt-4o"
-                elif complexity > thresholds["medium"]:
-                    # Medium complexity - balance capability and cost
-                    selected_model = "gpt-4o-mini"
-                else:
-                    # Low complexity - use cost-effective model
-                    selected_model = "gpt-3.5-turbo"
-            else:
-                logger.warning(f"Unrecognized task type: {task}, using default model")
-                selected_model = self.model_config.get("default", self.default_model)
-                
-            logger.info(f"Selected model {selected_model} for {task} task with complexity {complexity:.2f} (based on complexity)")
-            return selected_model
+        Returns:
+            Model names, in the same order as the inputs
+        """
+        if len(tasks) != len(complexities):
+            raise ValueError("tasks and complexities must have the same length")
+        
+        # task -> (standard task, configured model or "")
+        resolved: Dict[str, Tuple[str, str]] = {}
+        models = []
+        for task, complexity in zip(tasks, complexities):
+            entry = resolved.get(task)
+            if entry is None:
+                standard_task = self._standardize_task(task)
+                configured_model = self.model_config.get(standard_task) or ""
+                if not configured_model and standard_task is not TASK_TRIAGE and standard_task not in self._tier_thresholds:
+                    # Unknown task: already warned above, so pin the default here
+                    # rather than warning again for every item
+                    configured_model = self.model_config.get("default", self.default_model)
+                entry = resolved[task] = (standard_task, configured_model)
+            standard_task, configured_model = entry
+            models.append(configured_model or self._select_by_complexity(standard_task, complexity))
+        
+        logger.info("Selected models for %d tasks (%d distinct task types)", len(models), len(resolved))
+        return models
+    
+    def _standardize_task(self, task: str) -> str:
+        """Map a task alias to its model_config key, warning on unknown tasks."""
+        standard_task = self._TASK_ALIASES.get(task)
+        if standard_task is None:
+            logger.warning("Unknown task type: %s, will try to use as-is or fall back to default", task)
+            return task
+        return standard_task
+    
+    def _select_by_complexity(self, task: str, complexity: float) -> str:
+        """
+        Pick a fallback model tier for a task with no configured model.
+        
+        Args:
+            task: Standardized task type
+            complexity: Complexity score (0-1)
             
-        except Exception as e:
-            logger.error(f"Error in model selection: {str(e)}, using default model {self.default_model}")
-            # Return the default model as a fallback
+        Returns:
+            Model name to use
+        """
+        if task is TASK_TRIAGE:
+            # Triage is a simple routing task, use lightweight model
+            return self._TIER_MODELS[0]
+        
+        thresholds = self._tier_thresholds.get(task)
+        if thresholds is None:
+            logger.warning("Unrecognized task type: %s, using default model", task)
             return self.model_config.get("default", self.default_model)
+        
+        # bisect_left counts the cut-offs strictly below complexity, so a score
+        # must exceed a threshold to move up a tier
+        return self._TIER_MODELS[bisect.bisect_left(thresholds, complexity)]
             
-    def update_tool_choice(self, agent_config: Dict[str, Any], complexity: float) -> Dict[str, Any]:
+    def update_model_kwargs(self, model_kwargs: Mapping[str, Any], complexity: float) -> Mapping[str, Any]:
         """
-        Update tool choice based on complexity to ensure proper tool usage.
+        Build the model kwargs for an agent run based on complexity.
         
         Args:
-            agent_config: Agent configuration dictionary
+            model_kwargs: The agent's current model kwargs (replaced, not merged)
             complexity: Task complexity score from 0-1
             
         Returns:
-            Updated agent configuration
+            Read-only model kwargs to use for the run
         """
         if complexity > 0.8:
             # Force tool use for very complex scenarios
-            agent_config["model_kwargs"] = {"tool_choice": "required"}
+            return _TC_REQUIRED
         elif complexity > 0.6:
             # Specify that tools are available for moderately complex scenarios
-            agent_config["model_kwargs"] = {"tool_choice": "auto"}
+            return _TC_AUTO
         else:
             # No special tool choice for simpler scenarios
-            agent_config["model_kwargs"] = {}
+            return _TC_NONE
+            
+    def update_tool_choice(self, agent_config: Dict[str, Any], complexity: float) -> Dict[str, Any]:
+        """
+        Update tool choice based on complexity to ensure proper tool usage.
+        
+        Args:
+            agent_config: Agent configuration dictionary
+            complexity: Task complexity score from 0-1
             
+        Returns:
+            Updated agent configuration
+        """
+        agent_config["model_kwargs"] = self.update_model_kwargs(agent_config.get("model_kwargs"), complexity)
         return agent_config
 
     def calculate_timeout(self, base_timeout: int, complexity: float) -> int:
@@ -191,10 +259,29 @@ class ModelSelectionStrategy:
         Returns:
             Adjusted timeout in seconds
         """
-        # Scale timeout based on complexity, with a minimum
-        min_timeout = 60  # Minimum 60 seconds
-        scaling_factor = 1 + 2 * complexity  # Up to 3x for most complex tasks
+        # Scale timeout up to 3x for the most complex tasks, with complexity
+        # rounded to the nearest 0.1, and never below the minimum
+        index = min(10, max(0, round(complexity * 10)))
+        timeout = int(base_timeout * self._TIMEOUT_SCALE_LUT[index]) // 1000
+        if timeout < self._MIN_TIMEOUT:
+            timeout = self._MIN_TIMEOUT
+        logger.debug("Calculated timeout: %ds (base: %ds, complexity: %.2f)", timeout, base_timeout, complexity)
+        return timeout
+
+def get_strategy(default_model: str = None, env_prefix: str = "MODEL_") -> ModelSelectionStrategy:
+    """
+    Get a shared ModelSelectionStrategy, rebuilt after settings are reloaded.
+    
+    Args:
+        default_model: Fallback model if no specific model is configured
+        env_prefix: Prefix for model settings (e.g., MODEL_PLANNING)
         
-        timeout = max(min_timeout, int(base_timeout * scaling_factor))
-        logger.debug(f"Calculated timeout: {timeout}s (base: {base_timeout}s, complexity: {complexity:.2f})")
-        return timeout 
\ No newline at end of file
+    Returns:
+        The shared strategy instance for these arguments
+    """
+    return _get_strategy(default_model, env_prefix, get_settings_version())
+
+@functools.lru_cache(maxsize=4)
+def _get_strategy(default_model: Optional[str], env_prefix: str, settings_version: int) -> ModelSelectionStrategy:
+    # settings_version only keys the cache so update_settings() invalidates it
+    return ModelSelectionStrategy(default_model=default_model, env_prefix=env_prefix)
@@ -6,24 +6,33 @@ This module handles the setup of the OpenAI API client with proper authenticatio
 
 import os
 import logging
+import functools
 from openai import OpenAI
 from dotenv import load_dotenv
 
+try:
+    from agents import set_tracing_disabled as _set_tracing_disabled
+except ImportError:
+    _set_tracing_disabled = None
+
 # Create logger
 logger = logging.getLogger(__name__)
 
+# Load .env file if it exists, once at import
+load_dotenv()
+
+@functools.lru_cache(maxsize=1)
 def setup_openai_client():
     """
     Set up and configure the OpenAI client with API key from environment.
     
     This needs to be called before any OpenAI API interaction or Agent usage.
+    The client is created once and shared; call setup_openai_client.cache_clear()
+    to pick up a changed API key.
     
     Returns:
         OpenAI client object
     """
-    # Load .env file if it exists
-    load_dotenv()
-    
     # Get API key from environment
     api_key = os.environ.get("OPENAI_API_KEY")
     
@@ -35,4 +44,24 @@ def setup_openai_client():
     client = OpenAI(api_key=api_key)
     logger.info("OpenAI client successfully initialized")
     
-    return client 
\ No newline at end of file
+    return client
+
+def configure_tracing(enabled: bool) -> None:
+    """
+    Disable the Agents SDK trace exporter when tracing is turned off.
+    
+    Enabling leaves the SDK default alone, since an explicit setting would
+    override OPENAI_AGENTS_DISABLE_TRACING in the environment.
+    
+    Args:
+        enabled: Whether agent runs should be traced
+    """
+    if enabled:
+        return
+    
+    if _set_tracing_disabled is None:
+        logger.warning("Agents SDK tracing controls are unavailable; leaving tracing unchanged")
+        return
+    
+    _set_tracing_disabled(disabled=True)
+    logger.info("Agent tracing %s", "enabled" if enabled else "disabled")
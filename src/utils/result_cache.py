@@ -0,0 +1,188 @@
+"""
+Result Cache Module - Content-addressed cache for agent run results
+
+This module stores agent results on disk keyed by a SHA-256 fingerprint of
+the agent name, model and input, so identical requests can skip the LLM
+round-trip entirely. The cache is disabled unless RESULT_CACHE_DIR is set.
+
+Only a CachedRunResult projection of each run is stored, as JSON, since
+full RunResult objects hold references that cannot be serialized. The cache
+directory is created private to the current user, and entries are ignored
+when it is owned by anyone else.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from ..config.settings import settings
+
+# Create the logger
+logger = logging.getLogger(__name__)
+
+_ENTRY_SUFFIX = ".json"
+
+@dataclass(frozen=True, slots=True)
+class CachedRunResult:
+    """Serializable projection of a RunResult, returned on cache hits."""
+    final_output: Any
+
+    @classmethod
+    def from_run_result(cls, result: Any) -> "CachedRunResult":
+        """Keep only the parts of a RunResult that callers read."""
+        return cls(final_output=result.final_output)
+
+def fingerprint(agent_name: str, model_info: str, input_data: str) -> str:
+    """
+    Build the cache key for an agent run.
+
+    Args:
+        agent_name: Name of the agent being run
+        model_info: Model the agent runs with
+        input_data: The serialized agent input
+
+    Returns:
+        Hex SHA-256 digest identifying the run
+    """
+    return hashlib.sha256(f"{agent_name}|{model_info}|{input_data}".encode()).hexdigest()
+
+def _cache_dir() -> Optional[str]:
+    """Return the configured cache directory, or None when caching is disabled."""
+    return settings.get("RESULT_CACHE_DIR") or None
+
+def enabled() -> bool:
+    """Return True when RESULT_CACHE_DIR is configured."""
+    return _cache_dir() is not None
+
+def _entry_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key + _ENTRY_SUFFIX)
+
+def _is_private_dir(cache_dir: str) -> bool:
+    """Return True when cache_dir exists and is owned by the current user."""
+    try:
+        owner = os.stat(cache_dir).st_uid
+    except OSError:
+        return False
+    # Ownership cannot be checked on platforms without POSIX user ids
+    if hasattr(os, "getuid") and owner != os.getuid():
+        logger.warning("Ignoring result cache %s: it is owned by another user", cache_dir)
+        return False
+    return True
+
+def get(key: str) -> Optional[CachedRunResult]:
+    """
+    Look up a cached result.
+
+    Args:
+        key: Fingerprint returned by fingerprint()
+
+    Returns:
+        The cached result, or None on a miss, an expired entry or when disabled
+    """
+    cache_dir = _cache_dir()
+    if not cache_dir or not _is_private_dir(cache_dir):
+        return None
+
+    path = _entry_path(cache_dir, key)
+    try:
+        with open(path, "rb") as f:
+            entry = json.load(f)
+        created_at = float(entry["created_at"])
+        result = CachedRunResult(final_output=entry["final_output"])
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Discarding unreadable cache entry %s: %s", key, e)
+        _remove(path)
+        return None
+
+    if time.time() - created_at > float(settings.get("RESULT_CACHE_TTL", 604800)):
+        _remove(path)
+        return None
+
+    # Refresh the mtime so eviction treats this entry as recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    logger.debug("Result cache hit for %s", key)
+    return result
+
+def put(key: str, result: CachedRunResult) -> None:
+    """
+    Store a result in the cache, evicting least recently used entries over the size cap.
+
+    Never raises: failures are logged and the result is simply not cached.
+
+    Args:
+        key: Fingerprint returned by fingerprint()
+        result: The result to cache; its final_output must be JSON serializable
+    """
+    cache_dir = _cache_dir()
+    if not cache_dir:
+        return
+
+    try:
+        payload = json.dumps({"created_at": time.time(), "final_output": result.final_output}).encode()
+    except (TypeError, ValueError) as e:
+        logger.warning("Result for %s is not cacheable: %s", key, e)
+        return
+
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        if not _is_private_dir(cache_dir):
+            return
+        # Write to a temp file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, _entry_path(cache_dir, key))
+        except BaseException:
+            _remove(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning("Failed to write result cache entry %s: %s", key, e)
+        return
+
+    _evict(cache_dir, int(settings.get("RESULT_CACHE_MAX_BYTES", 104857600)))
+
+def _evict(cache_dir: str, max_bytes: int) -> None:
+    """Remove least recently used entries until the cache fits in max_bytes."""
+    entries = []
+    total = 0
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(_ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+    except OSError as e:
+        logger.warning("Failed to scan result cache %s: %s", cache_dir, e)
+        return
+
+    if total <= max_bytes:
+        return
+
+    for _, size, path in sorted(entries):
+        _remove(path)
+        total -= size
+        if total <= max_bytes:
+            break
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
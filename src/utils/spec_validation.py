@@ -1,17 +1,65 @@
 import json
 import yaml
+import asyncio
 import re
 from typing import Tuple, Dict, List, Any, Optional
 import logging
 
 from ..errors.exceptions import SpecValidationError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Use the libyaml-backed loader when PyYAML was built with it
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 logger = logging.getLogger(__name__)
 
+def _loads_json(spec_text: str) -> Any:
+    """Parse JSON text, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(spec_text)
+        except orjson.JSONDecodeError:
+            # orjson rejects a few inputs json accepts (e.g. NaN, ints over 64 bits)
+            pass
+    return json.loads(spec_text)
+
+# OpenAPI versions and paths are ASCII, so match them in ASCII mode
+_SEMVER_RE = re.compile(r'^\d+\.\d+\.\d+$', re.ASCII)
+_PATH_PARAM_RE = re.compile(r'\{([^}]+)\}', re.ASCII)
+# Path item keys that hold operations
+_HTTP_METHODS = frozenset({"get", "put", "post", "delete", "options", "head", "patch"})
+# JSON documents start with an object or array after optional whitespace
+_JSON_START_RE = re.compile(r'\s*[\[{]')
+
 async def validate_openapi_spec(spec_text: str) -> Tuple[Dict[str, Any], List[str]]:
     """
     Validate an OpenAPI spec and return parsed object and warnings.
     
+    Parsing and validation run in a worker thread so large specs do not
+    block the event loop.
+    
+    Args:
+        spec_text: Raw OpenAPI spec text (YAML or JSON)
+        
+    Returns:
+        Tuple of (parsed_spec, warnings)
+        
+    Raises:
+        SpecValidationError: If the spec is invalid or cannot be parsed
+    """
+    return await asyncio.to_thread(_validate_openapi_spec_sync, spec_text)
+
+def _validate_openapi_spec_sync(spec_text: str) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Validate an OpenAPI spec synchronously; see validate_openapi_spec.
+    
     Args:
         spec_text: Raw OpenAPI spec text (YAML or JSON)
         
@@ -24,8 +72,8 @@ async def validate_openapi_spec(spec_text: str) -> Tuple[Dict[str, Any], List[st
     warnings = []
     parsed_spec = None
     
-    # Check for empty input
-    if not spec_text or not spec_text.strip():
+    # Check for empty input (isspace scans in place, unlike strip)
+    if not spec_text or spec_text.isspace():
         raise SpecValidationError("Empty specification provided", {"spec": "empty"})
     
     # Check for excessive size to prevent DOS
@@ -35,16 +83,22 @@ async def validate_openapi_spec(spec_text: str) -> Tuple[Dict[str, Any], List[st
             {"size": len(spec_text), "max_size": 2_000_000}
         )
     
-    # Try parsing as JSON first
-    try:
-        parsed_spec = json.loads(spec_text)
-        logger.debug("Successfully parsed spec as JSON")
-    except json.JSONDecodeError:
-        warnings.append("JSON parsing failed, trying YAML")
+    # Only JSON-looking text goes through the JSON parser; everything else
+    # (and malformed JSON) is parsed as YAML
+    if _JSON_START_RE.match(spec_text):
         try:
-            parsed_spec = yaml.safe_load(spec_text)
+            parsed_spec = _loads_json(spec_text)
+            logger.debug("Successfully parsed spec as JSON")
+        except json.JSONDecodeError:
+            warnings.append("JSON parsing failed, trying YAML")
+    
+    if parsed_spec is None:
+        try:
+            parsed_spec = yaml.load(spec_text, Loader=_YamlLoader)
             logger.debug("Successfully parsed spec as YAML")
         except Exception as e:
+            # Any loader failure (syntax, unconstructable values, nesting too
+            # deep to recurse through) is a bad spec from the caller's view
             error_message = f"YAML parsing failed: {str(e)}"
             warnings.append(error_message)
             logger.error(error_message)
@@ -63,7 +117,7 @@ async def validate_openapi_spec(spec_text: str) -> Tuple[Dict[str, Any], List[st
     else:
         # Validate version format
         version = str(parsed_spec["openapi"])
-        if not re.match(r'^\d+\.\d+\.\d+$', version):
+        if not _SEMVER_RE.match(version):
             warnings.append(f"Invalid 'openapi' version format: {version}. Expected format: X.Y.Z")
     
     if "info" not in parsed_spec:
@@ -82,25 +136,24 @@ async def validate_openapi_spec(spec_text: str) -> Tuple[Dict[str, Any], List[st
         warnings.append("Warning: 'paths' section is empty. No endpoints are defined.")
     
     # Validate path formats
-    for path in parsed_spec.get("paths", {}):
+    for path, path_item in parsed_spec.get("paths", {}).items():
         if not path.startswith('/'):
             warnings.append(f"Path '{path}' does not start with '/'")
         
-        # Check for path parameters
-        path_params = re.findall(r'\{([^}]+)\}', path)
+        # Check that path parameters are defined by at least one operation
+        path_params = _PATH_PARAM_RE.findall(path)
+        if not path_params:
+            continue
+        
+        defined_params = {
+            op_param.get("name")
+            for method, operation in path_item.items()
+            if method in _HTTP_METHODS
+            for op_param in operation.get("parameters", [])
+            if op_param.get("in") == "path"
+        }
         for param in path_params:
-            # Check if path parameters are defined
-            param_defined = False
-            for method, operation in parsed_spec["paths"][path].items():
-                if method not in ["get", "put", "post", "delete", "options", "head", "patch"]:
-                    continue
-                
-                for op_param in operation.get("parameters", []):
-                    if op_param.get("name") == param and op_param.get("in") == "path":
-                        param_defined = True
-                        break
-            
-            if not param_defined:
+            if param not in defined_params:
                 warnings.append(f"Path parameter '{param}' in '{path}' is not defined in any operation")
     
     return parsed_spec, warnings 
\ No newline at end of file
@@ -0,0 +1,21 @@
+"""
+Test Module for Complexity Heuristics
+
+This module contains tests for the keyword complexity classifier to verify it works as expected.
+"""
+
+from ..utils.complexity_heuristics import quick_classify, SIMPLE_COMPLEXITY, COMPLEX_COMPLEXITY
+
+def test_quick_classify_simple_and_complex_inputs():
+    """Test that unambiguous keyword inputs are classified."""
+    assert quick_classify("List all users in the system") == SIMPLE_COMPLEXITY
+    assert quick_classify("What is the base URL?") == SIMPLE_COMPLEXITY
+    assert quick_classify("Design a test flow for checkout") == COMPLEX_COMPLEXITY
+    assert quick_classify("Explain why the login test fails") == COMPLEX_COMPLEXITY
+
+def test_quick_classify_returns_none_when_unsure():
+    """Test that mixed, keyword-free and non-string inputs are left unclassified."""
+    assert quick_classify("Design a list endpoint") is None
+    assert quick_classify("Generate tests for the users API") is None
+    assert quick_classify("listing designs") is None
+    assert quick_classify(None) is None
@@ -0,0 +1,261 @@
+"""
+Test Module for Agent Execution
+
+This module contains tests for the agent execution helpers to verify they work as expected.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from agents import Agent, RunContextWrapper, RunResult
+
+from ..config.settings import settings
+from ..utils import execution
+from ..utils.complexity_heuristics import COMPLEX_COMPLEXITY
+from ..utils.execution import RetryConfig, RunConfig, run_agents_batch
+from ..utils.model_selection import ModelSelectionStrategy
+
+def test_run_agents_batch_preserves_order_and_errors():
+    """Test that batch results come back in job order with failures captured."""
+    async def fake_run(agent, input_data, **kwargs):
+        if input_data == "boom":
+            raise RuntimeError("agent failed")
+        await asyncio.sleep(0.01 if input_data == "slow" else 0)
+        return f"result-{input_data}", f"trace-{input_data}"
+
+    jobs = [
+        {"agent": None, "input_data": "slow"},
+        {"agent": None, "input_data": "boom"},
+        {"agent": None, "input_data": "fast"},
+    ]
+    with patch.object(execution, "run_agent_with_retry", side_effect=fake_run):
+        results = asyncio.run(run_agents_batch(jobs))
+
+    assert results[0] == ("result-slow", "trace-slow")
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == ("result-fast", "trace-fast")
+
+def test_run_agents_batch_respects_concurrency():
+    """Test that no more than max_concurrency jobs run at once."""
+    running = 0
+    peak = 0
+
+    async def fake_run(agent, input_data, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return input_data, "trace"
+
+    jobs = [{"agent": None, "input_data": str(i)} for i in range(10)]
+    with patch.object(execution, "run_agent_with_retry", side_effect=fake_run):
+        results = asyncio.run(run_agents_batch(jobs, max_concurrency=3))
+
+    assert peak == 3
+    assert [r[0] for r in results] == [str(i) for i in range(10)]
+
+def test_run_agent_with_retry_backs_off_without_blocking():
+    """Test that retries wait with asyncio.sleep rather than blocking the event loop."""
+    agent = Agent(name="RetryAgent", instructions="Test agent")
+    run_result = object()
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    with patch.object(execution.Runner, "run", side_effect=[RuntimeError("rate limited"), run_result]), \
+         patch("asyncio.sleep", side_effect=fake_sleep):
+        result, trace_id = asyncio.run(execution.run_agent_with_retry(
+            agent, "input", config=RetryConfig(max_retries=3, max_jitter=0.0)
+        ))
+
+    assert result is run_result
+    assert trace_id
+    assert sleeps == [1]
+
+class _FakeStreamedRun:
+    """Minimal stand-in for the streaming result returned by Runner.run_streamed."""
+    def __init__(self, events, final_output):
+        self._events = events
+        self.final_output = final_output
+
+    async def stream_events(self):
+        for event in self._events:
+            yield event
+
+def test_run_agent_with_streaming_exposes_trace_context():
+    """Test that progress callbacks can read the run metadata from trace_context."""
+    agent = Agent(name="StreamingAgent", instructions="Test agent")
+    events = [SimpleNamespace(delta="Hello", item_type="message")]
+    seen = []
+
+    async def callback(agent_name, item_type, content):
+        seen.append((agent_name, item_type, content, execution.trace_context.get()))
+
+    async def run_and_check_reset():
+        output = await execution.run_agent_with_streaming(agent, "input", callback)
+        # asyncio.run copies the context, so the reset is only visible in here
+        assert execution.trace_context.get() is None
+        return output
+
+    with patch.object(execution.Runner, "run_streamed", return_value=_FakeStreamedRun(events, "done")):
+        output = asyncio.run(run_and_check_reset())
+
+    assert output == "done"
+    assert len(seen) == 1
+    agent_name, item_type, content, context = seen[0]
+    assert (agent_name, item_type, content) == ("StreamingAgent", "message", "Hello")
+    assert context["agent"] == "StreamingAgent"
+    assert context["trace_id"]
+
+def test_run_agent_with_streaming_delivers_progress_in_order():
+    """Test that queued progress updates arrive in order despite callback errors."""
+    agent = Agent(name="StreamingAgent", instructions="Test agent")
+    events = [SimpleNamespace(delta=str(i), item_type="message") for i in range(5)]
+    delivered = []
+
+    async def callback(agent_name, item_type, content):
+        await asyncio.sleep(0)
+        if content == "2":
+            raise RuntimeError("consumer failed")
+        delivered.append(content)
+
+    with patch.object(execution.Runner, "run_streamed", return_value=_FakeStreamedRun(events, "done")):
+        output = asyncio.run(execution.run_agent_with_streaming(agent, "input", callback))
+
+    assert output == "done"
+    assert delivered == ["0", "1", "3", "4"]
+
+def test_run_agent_with_streaming_propagates_callback_cancellation():
+    """Test that a callback raising CancelledError ends the stream instead of hanging it."""
+    agent = Agent(name="StreamingAgent", instructions="Test agent")
+    events = [SimpleNamespace(delta=str(i), item_type="message") for i in range(3)]
+
+    async def callback(agent_name, item_type, content):
+        raise asyncio.CancelledError()
+
+    with patch.object(execution.Runner, "run_streamed", return_value=_FakeStreamedRun(events, "done")), \
+         pytest.raises(asyncio.CancelledError):
+        asyncio.run(asyncio.wait_for(execution.run_agent_with_streaming(agent, "input", callback), 3))
+
+def test_run_agent_with_retry_restores_agent_after_failure():
+    """Test that model selection changes are undone when every attempt fails."""
+    agent = Agent(name="FailingAgent", instructions="Test agent", model="original-model")
+    agent.model_kwargs = {"tool_choice": "none"}
+
+    async def fake_sleep(seconds):
+        pass
+
+    with patch.object(execution.Runner, "run", side_effect=RuntimeError("down")), \
+         patch("asyncio.sleep", side_effect=fake_sleep):
+        with pytest.raises(RuntimeError):
+            asyncio.run(execution.run_agent_with_retry(
+                agent, "input", config=RetryConfig(max_retries=2), complexity=0.9
+            ))
+
+    assert agent.model == "original-model"
+    assert agent.model_kwargs == {"tool_choice": "none"}
+
+def test_run_agent_with_retry_estimates_missing_complexity():
+    """Test that input keywords pick the model when no complexity is given."""
+    agent = Agent(name="PlanningAgent", instructions="Test agent")
+    with patch.dict(settings, {"MODEL_PLANNING": ""}):
+        strategy = ModelSelectionStrategy()
+    models = []
+
+    async def fake_run(agent, input, **kwargs):
+        models.append(agent.model)
+        return object()
+
+    def run(input_data, **kwargs):
+        asyncio.run(execution.run_agent_with_retry(
+            agent, input_data, task="planning", model_selection=strategy, **kwargs
+        ))
+        return models[-1]
+
+    with patch.object(execution.Runner, "run", side_effect=fake_run):
+        assert run("design a user API") == strategy.select_model("planning", COMPLEX_COMPLEXITY)
+        assert run({"request": "design a user API"}) == strategy.select_model("planning", COMPLEX_COMPLEXITY)
+        # No keywords: falls back to a complexity of 0.5
+        assert run("add a user endpoint") == strategy.select_model("planning", 0.5)
+        # An explicit run_config wins over the keyword estimate
+        assert run("design a user API", run_config=RunConfig(complexity=0.2, task="planning")) == \
+            strategy.select_model("planning", 0.2)
+
+    assert strategy.select_model("planning", COMPLEX_COMPLEXITY) != strategy.select_model("planning", 0.5)
+
+def test_run_agent_with_streaming_noop_callback_skips_progress():
+    """Test that NOOP_PROGRESS_CALLBACK runs the stream without building progress updates."""
+    agent = Agent(name="StreamingAgent", instructions="Test agent")
+    events = [SimpleNamespace(delta=str(i), item_type="message") for i in range(3)]
+
+    with patch.object(execution.Runner, "run_streamed", return_value=_FakeStreamedRun(events, "done")), \
+         patch.object(execution, "_enqueue_progress") as enqueue:
+        output = asyncio.run(execution.run_agent_with_streaming(
+            agent, "input", execution.NOOP_PROGRESS_CALLBACK
+        ))
+
+    assert output == "done"
+    enqueue.assert_not_called()
+
+def test_run_agent_with_retry_skips_tracing_when_disabled():
+    """Test that no trace span or trace id is created when AGENT_TRACING is off."""
+    agent = Agent(name="UntracedAgent", instructions="Test agent")
+    run_result = object()
+
+    with patch.dict(settings, {"AGENT_TRACING": False}), \
+         patch.object(execution, "trace") as trace_mock, \
+         patch.object(execution.Runner, "run", return_value=run_result):
+        result, trace_id = asyncio.run(execution.run_agent_with_retry(agent, "input"))
+
+    assert result is run_result
+    assert trace_id == ""
+    trace_mock.assert_not_called()
+
+def _make_run_result(agent, final_output):
+    """Build a real RunResult, which holds weak references and cannot be pickled."""
+    return RunResult(
+        input="input",
+        new_items=[],
+        raw_responses=[],
+        final_output=final_output,
+        input_guardrail_results=[],
+        output_guardrail_results=[],
+        tool_input_guardrail_results=[],
+        tool_output_guardrail_results=[],
+        context_wrapper=RunContextWrapper(context=None),
+        _last_agent=agent,
+    )
+
+def test_run_agent_with_retry_serves_repeat_runs_from_cache(tmp_path):
+    """Test that a second identical run is served from the result cache."""
+    agent = Agent(name="CachedAgent", instructions="Test agent")
+    run_result = _make_run_result(agent, "cached output")
+
+    with patch.dict(settings, {"RESULT_CACHE_DIR": str(tmp_path)}), \
+         patch.object(execution.Runner, "run", return_value=run_result) as run_mock:
+        first, _ = asyncio.run(execution.run_agent_with_retry(agent, "input", complexity=0.5))
+        second, _ = asyncio.run(execution.run_agent_with_retry(agent, "input", complexity=0.5))
+
+    assert first is run_result
+    assert second.final_output == "cached output"
+    assert run_mock.await_count == 1
+
+def test_run_agent_with_retry_skips_cache_with_context(tmp_path):
+    """Test that runs with a context are never cached, since it is not part of the key."""
+    agent = Agent(name="ContextAgent", instructions="Test agent")
+    run_result = _make_run_result(agent, "output")
+
+    with patch.dict(settings, {"RESULT_CACHE_DIR": str(tmp_path)}), \
+         patch.object(execution.Runner, "run", return_value=run_result) as run_mock:
+        for user in ("alice", "bob"):
+            result, _ = asyncio.run(execution.run_agent_with_retry(
+                agent, "input", context={"user": user}, complexity=0.5
+            ))
+            assert result is run_result
+
+    assert run_mock.await_count == 2
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,112 @@
+"""
+Test Module for Model Selection
+
+This module contains tests for the model selection strategy to verify it works as expected.
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+
+from ..config.settings import settings, update_settings
+from ..utils.model_selection import ModelSelectionStrategy, get_strategy
+
+@pytest.fixture(scope="module")
+def strategy():
+    """Strategy built from the default settings, shared by read-only tests."""
+    return ModelSelectionStrategy()
+
+def test_select_model_uses_configured_models():
+    """Test that configured task models win, including for aliased tasks."""
+    with patch.dict(settings, {"MODEL_CODING": "configured-coder"}):
+        strategy = ModelSelectionStrategy()
+
+    assert strategy.select_model("coding", 0.1) == "configured-coder"
+    assert strategy.select_model("code_generation", 0.9) == "configured-coder"
+    assert strategy.select_model("script_coding", 0.5) == strategy.model_config["script_coding"]
+
+def test_select_model_falls_back_by_complexity():
+    """Test complexity tiers for tasks without a configured model."""
+    with patch.dict(settings, {"MODEL_PLANNING": ""}):
+        strategy = ModelSelectionStrategy()
+
+    assert strategy.select_model("planning", 0.9) == "gpt-4o"
+    assert strategy.select_model("planning", 0.7) == "gpt-4o-mini"
+    assert strategy.select_model("planning", 0.4) == "gpt-3.5-turbo"
+    assert strategy.select_model("planning", 0.0) == "gpt-3.5-turbo"
+
+def test_select_model_unknown_task_uses_default(strategy):
+    """Test that unknown tasks fall back to the default model."""
+    assert strategy.select_model("unknown_task", 0.5) == strategy.model_config["default"]
+
+def test_model_config_is_read_only(strategy):
+    """Test that the model configuration cannot be changed after init."""
+    with pytest.raises(TypeError):
+        strategy.model_config["coding"] = "other-model"
+
+def test_get_strategy_returns_shared_instance():
+    """Test that get_strategy reuses one strategy per argument set."""
+    assert get_strategy() is get_strategy()
+    assert get_strategy("other-model") is not get_strategy()
+
+def test_get_strategy_rebuilds_after_settings_reload():
+    """Test that reloading settings gives callers a strategy with the new values."""
+    before = get_strategy()
+
+    try:
+        with patch.dict(os.environ, {"MODEL_BP_AUTHOR": "reloaded-model"}):
+            update_settings()
+            after = get_strategy()
+    finally:
+        update_settings()
+
+    assert after is not before
+    assert after.select_model("blueprint_authoring", 0.5) == "reloaded-model"
+
+def test_update_model_kwargs_returns_shared_constants(strategy):
+    """Test tool choice levels and that the kwargs objects are reused."""
+    assert strategy.update_model_kwargs({}, 0.9) == {"tool_choice": "required"}
+    assert strategy.update_model_kwargs({}, 0.7) == {"tool_choice": "auto"}
+    assert strategy.update_model_kwargs({}, 0.2) == {}
+    assert strategy.update_model_kwargs({}, 0.9) is strategy.update_model_kwargs({}, 0.95)
+    assert strategy.update_tool_choice({}, 0.7) == {"model_kwargs": {"tool_choice": "auto"}}
+
+def test_calculate_timeout_scales_with_complexity(strategy):
+    """Test timeout scaling, clamping and the minimum timeout."""
+    assert strategy.calculate_timeout(300, 0.0) == 300
+    assert strategy.calculate_timeout(300, 0.5) == 600
+    assert strategy.calculate_timeout(300, 1.0) == 900
+    assert strategy.calculate_timeout(300, 1.5) == 900
+    assert strategy.calculate_timeout(10, 0.5) == 60
+
+def test_select_models_batch_matches_select_model():
+    """Test that batch selection agrees with per-call selection."""
+    with patch.dict(settings, {"MODEL_PLANNING": ""}):
+        strategy = ModelSelectionStrategy()
+    tasks = ["planning", "code_generation", "planning", "unknown_task", "triage"]
+    complexities = [0.9, 0.2, 0.1, 0.5, 0.5]
+
+    assert strategy.select_models_batch(tasks, complexities) == [
+        strategy.select_model(task, complexity) for task, complexity in zip(tasks, complexities)
+    ]
+
+def test_select_models_batch_warns_once_per_unknown_task(caplog):
+    """Test that an unknown task is warned about once per batch, not once per item."""
+    # Fresh strategy so no earlier selection has warmed its cache
+    strategy = ModelSelectionStrategy()
+
+    with caplog.at_level("WARNING", logger="src.utils.model_selection"):
+        models = strategy.select_models_batch(["unknown_task"] * 5, [0.1, 0.3, 0.5, 0.7, 0.9])
+
+    assert len([r for r in caplog.records if r.levelname == "WARNING"]) == 1
+    assert models == [strategy.model_config["default"]] * 5
+
+def test_select_model_caches_per_instance():
+    """Test that repeated selections are served from the instance cache."""
+    strategy = ModelSelectionStrategy()
+
+    first = strategy.select_model("coding", 0.7)
+    assert strategy.select_model("coding", 0.7) == first
+    info = strategy._select_cached.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    assert ModelSelectionStrategy()._select_cached.cache_info().currsize == 0
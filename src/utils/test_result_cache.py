@@ -0,0 +1,68 @@
+"""
+Test Module for the Result Cache
+
+This module contains tests for the agent result cache to verify it works as expected.
+"""
+
+import os
+from unittest.mock import patch
+
+from ..config.settings import settings
+from ..utils import result_cache
+
+def test_result_cache_disabled_by_default():
+    """Test that nothing is cached when RESULT_CACHE_DIR is not set."""
+    with patch.dict(settings, {"RESULT_CACHE_DIR": None}):
+        key = result_cache.fingerprint("Agent", "gpt-4o", "input")
+        result_cache.put(key, result_cache.CachedRunResult("ok"))
+        assert result_cache.get(key) is None
+
+def test_result_cache_round_trip_and_ttl(tmp_path):
+    """Test storing, reading and expiring a cached result."""
+    with patch.dict(settings, {"RESULT_CACHE_DIR": str(tmp_path / "cache"), "RESULT_CACHE_TTL": 60}):
+        key = result_cache.fingerprint("Agent", "gpt-4o", "input")
+        assert key != result_cache.fingerprint("Agent", "gpt-4o-mini", "input")
+
+        result_cache.put(key, result_cache.CachedRunResult("ok"))
+        assert result_cache.get(key) == result_cache.CachedRunResult("ok")
+        assert os.stat(tmp_path / "cache").st_mode & 0o777 == 0o700
+
+        settings["RESULT_CACHE_TTL"] = -1
+        assert result_cache.get(key) is None
+        assert not os.listdir(tmp_path / "cache")
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    """Test that the oldest entries are evicted once the size cap is exceeded."""
+    with patch.dict(settings, {"RESULT_CACHE_DIR": str(tmp_path), "RESULT_CACHE_MAX_BYTES": 1500}):
+        keys = [result_cache.fingerprint("Agent", "gpt-4o", str(i)) for i in range(3)]
+        for i, key in enumerate(keys):
+            result_cache.put(key, result_cache.CachedRunResult("x" * 600))
+            os.utime(tmp_path / (key + ".json"), (i, i))
+
+        result_cache.put(result_cache.fingerprint("Agent", "gpt-4o", "new"), result_cache.CachedRunResult("x" * 600))
+
+        assert result_cache.get(keys[0]) is None
+        assert result_cache.get(keys[2]) == result_cache.CachedRunResult("x" * 600)
+
+def test_result_cache_put_never_raises(tmp_path):
+    """Test that unserializable results and eviction errors are logged, not raised."""
+    with patch.dict(settings, {"RESULT_CACHE_DIR": str(tmp_path)}):
+        key = result_cache.fingerprint("Agent", "gpt-4o", "input")
+        result_cache.put(key, result_cache.CachedRunResult(object()))
+        assert result_cache.get(key) is None
+
+        with patch.object(result_cache.os, "scandir", side_effect=OSError("gone")):
+            result_cache.put(key, result_cache.CachedRunResult("ok"))
+        assert result_cache.get(key) == result_cache.CachedRunResult("ok")
+
+def test_result_cache_ignores_directory_owned_by_another_user(tmp_path):
+    """Test that entries are neither read nor written in a cache directory someone else owns."""
+    with patch.dict(settings, {"RESULT_CACHE_DIR": str(tmp_path)}):
+        key = result_cache.fingerprint("Agent", "gpt-4o", "input")
+        result_cache.put(key, result_cache.CachedRunResult("ok"))
+
+        with patch.object(result_cache.os, "getuid", return_value=os.getuid() + 1):
+            assert result_cache.get(key) is None
+            result_cache.put(result_cache.fingerprint("Agent", "gpt-4o", "other"), result_cache.CachedRunResult("ok"))
+
+        assert os.listdir(tmp_path) == [key + ".json"]
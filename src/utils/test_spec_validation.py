@@ -0,0 +1,80 @@
+"""
+Test Module for OpenAPI Spec Validation
+
+This module contains tests for the spec validation helpers to verify they work as expected.
+"""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from ..errors.exceptions import SpecValidationError
+from ..utils import spec_validation
+from ..utils.spec_validation import validate_openapi_spec
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Users API", "version": "1.0.0"},
+    "paths": {
+        "/users/{userId}": {
+            "get": {"parameters": [{"name": "userId", "in": "path", "required": True}]},
+        },
+        "/orders/{orderId}": {
+            "get": {"parameters": [{"name": "orderId", "in": "query"}]},
+        },
+    },
+}
+
+YAML_SPEC = """
+openapi: 3.0
+info:
+  title: Users API
+paths:
+  users: {}
+"""
+
+def test_validate_openapi_spec_parses_json():
+    """Test that a JSON spec parses and undefined path parameters are reported."""
+    parsed, warnings = asyncio.run(validate_openapi_spec(json.dumps(SPEC)))
+
+    assert parsed == SPEC
+    assert warnings == ["Path parameter 'orderId' in '/orders/{orderId}' is not defined in any operation"]
+
+def test_validate_openapi_spec_parses_yaml():
+    """Test that a YAML spec parses and format problems become warnings."""
+    parsed, warnings = asyncio.run(validate_openapi_spec(YAML_SPEC))
+
+    assert parsed["info"]["title"] == "Users API"
+    assert "Invalid 'openapi' version format: 3.0. Expected format: X.Y.Z" in warnings
+    assert "Missing 'version' in info section" in warnings
+    assert "Path 'users' does not start with '/'" in warnings
+    assert "JSON parsing failed, trying YAML" not in warnings
+
+def test_validate_openapi_spec_falls_back_to_yaml_for_malformed_json():
+    """Test that JSON-looking text the JSON parser rejects is retried as YAML."""
+    parsed, warnings = asyncio.run(validate_openapi_spec('{openapi: 3.0.0, paths: {}}'))
+
+    assert parsed == {"openapi": "3.0.0", "paths": {}}
+    assert "JSON parsing failed, trying YAML" in warnings
+
+def test_validate_openapi_spec_rejects_bad_input():
+    """Test that empty, unparseable and non-object specs raise SpecValidationError."""
+    bad_inputs = [
+        "",
+        "   \n",
+        "key: [unclosed",
+        "- just\n- a list",
+        # Valid YAML syntax whose timestamp the loader cannot construct
+        "openapi: 3.0.0\ninfo:\n  date: 2023-13-45\npaths: {}\n",
+        # Small enough to pass the size cap, but nested too deeply to load
+        "a: " + "[" * 5000 + "]" * 5000,
+    ]
+    # Use the pure-Python loader (the fallback without libyaml), which is the
+    # one that runs out of recursion depth on deeply nested input
+    with patch.object(spec_validation, "_YamlLoader", yaml.SafeLoader):
+        for spec_text in bad_inputs:
+            with pytest.raises(SpecValidationError):
+                asyncio.run(validate_openapi_spec(spec_text))
@@ -5,6 +5,7 @@ Test script for API Automation Assistant
 
 import requests
 import json
+import orjson
 import time
 import sys
 import os
@@ -146,14 +147,25 @@ SIMPLE_OPENAPI_SPEC = {
     }
 }
 
-def wait_for_job_completion(base_url: str, job_id: str, max_attempts: int = 30) -> dict:
+# Serialized once so repeated runs post the same payload without re-encoding
+_SPEC_JSON = orjson.dumps(SIMPLE_OPENAPI_SPEC).decode()
+
+# Shared session so status polls and submissions reuse keep-alive connections
+_session = requests.Session()
+
+# Poll delay grows from POLL_INITIAL_DELAY by POLL_BACKOFF per attempt, up to POLL_MAX_DELAY
+POLL_INITIAL_DELAY = 0.5
+POLL_BACKOFF = 1.5
+POLL_MAX_DELAY = 5.0
+
+def wait_for_job_completion(base_url: str, job_id: str, max_attempts: int = 65) -> dict:
     """
     Wait for a job to complete and return its result.
     
     Args:
         base_url: Base URL of the API
         job_id: Job ID to wait for
-        max_attempts: Maximum number of polling attempts
+        max_attempts: Maximum number of polling attempts (the default allows about 5 minutes)
         
     Returns:
         Job result dictionary
@@ -164,9 +176,9 @@ def wait_for_job_completion(base_url: str, job_id: str, max_attempts: int = 30)
     
     for attempt in range(max_attempts):
         try:
-            job_response = requests.get(f"{base_url}/status/{job_id}")
+            job_response = _session.get(f"{base_url}/status/{job_id}")
             job_response.raise_for_status()
-            job_result = job_response.json()
+            job_result = orjson.loads(job_response.content)
             
             status = job_result.get("status")
             progress = job_result.get("progress", {})
@@ -198,7 +210,8 @@ def wait_for_job_completion(base_url: str, job_id: str, max_attempts: int = 30)
                 print("\nTimed out waiting for job completion")
                 raise Exception("Timed out waiting for job completion")
             
-            time.sleep(10)  # Wait 10 seconds before polling again
+            # Back off so fast jobs are seen quickly without hammering slow ones
+            time.sleep(min(POLL_MAX_DELAY, POLL_INITIAL_DELAY * POLL_BACKOFF ** attempt))
         except Exception as e:
             print(f"\nError checking job status: {e}")
             raise
@@ -209,7 +222,7 @@ def test_blueprint_generation():
     
     # First, check if the API is healthy
     try:
-        health_response = requests.get(f"{base_url}/health")
+        health_response = _session.get(f"{base_url}/health")
         health_response.raise_for_status()
         print(f"API Health: {health_response.json()}")
     except Exception as e:
@@ -218,14 +231,14 @@ def test_blueprint_generation():
     
     # Prepare the request data for blueprint generation
     blueprint_request = {
-        "spec": json.dumps(SIMPLE_OPENAPI_SPEC),
+        "spec": _SPEC_JSON,
         "mode": "basic"
     }
     
     # Submit the request to generate blueprint
     try:
         print("Submitting blueprint generation request...")
-        response = requests.post(f"{base_url}/generate-blueprint", json=blueprint_request)
+        response = _session.post(f"{base_url}/generate-blueprint", json=blueprint_request)
         response.raise_for_status()
         result = response.json()
         job_id = result.get("job_id")
@@ -264,7 +277,7 @@ def test_script_generation(blueprint: dict):
     # Submit the request to generate scripts
     try:
         print("\nSubmitting script generation request...")
-        response = requests.post(f"{base_url}/generate-scripts", json=script_request)
+        response = _session.post(f"{base_url}/generate-scripts", json=script_request)
         response.raise_for_status()
         result = response.json()
         job_id = result.get("job_id")